@@ -5,7 +5,7 @@ Creates two USDA files that exercise all 8 MCP tools:
   - examples/desk_setup.usda       — scene hierarchy, materials, transforms
   - examples/product_configurator.usda — variant sets for product configuration
 
-Requires: usd-core (pip install usd-core)
+Requires: usd-core, numpy (pip install usd-core numpy)
 
 Usage:
     python scripts/generate_examples.py
@@ -14,7 +14,8 @@ Usage:
 import os
 from pathlib import Path
 
-from pxr import Gf, Sdf, Usd, UsdGeom, UsdShade
+import numpy as np
+from pxr import Gf, Sdf, Usd, UsdGeom, UsdShade, Vt
 
 
 EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
@@ -43,13 +44,23 @@ def _bind_material(prim, material):
 
 
 def _set_xform(xformable, translate=None, rotate=None, scale=None):
-    """Set translate/rotate/scale on an xformable prim."""
-    if translate:
-        xformable.AddTranslateOp().Set(Gf.Vec3d(*translate))
-    if rotate:
-        xformable.AddRotateXYZOp().Set(Gf.Vec3f(*rotate))
+    """Set translate/rotate/scale on an xformable prim as a single matrix op.
+
+    Composes scale, then XYZ rotation, then translation (the same order as a
+    translate/rotateXYZ/scale op stack) into one xformOp:transform.
+    """
+    if not (translate or rotate or scale):
+        return
+    matrix = Gf.Matrix4d(1.0)
     if scale:
-        xformable.AddScaleOp().Set(Gf.Vec3f(*scale))
+        matrix *= Gf.Matrix4d().SetScale(Gf.Vec3d(*scale))
+    if rotate:
+        for axis, angle in zip((Gf.Vec3d.XAxis(), Gf.Vec3d.YAxis(), Gf.Vec3d.ZAxis()), rotate):
+            if angle:
+                matrix *= Gf.Matrix4d().SetRotate(Gf.Rotation(axis, angle))
+    if translate:
+        matrix *= Gf.Matrix4d().SetTranslate(Gf.Vec3d(*translate))
+    xformable.AddTransformOp().Set(matrix)
 
 
 def _add_mesh_box(stage, path, size_x, size_y, size_z):
@@ -59,74 +70,58 @@ def _add_mesh_box(stage, path, size_x, size_y, size_z):
     hx, hy, hz = size_x / 2, size_y / 2, size_z / 2
 
     # 8 vertices of a box
-    points = [
+    points = np.array([
         (-hx, -hy, -hz), ( hx, -hy, -hz), ( hx,  hy, -hz), (-hx,  hy, -hz),  # bottom
         (-hx, -hy,  hz), ( hx, -hy,  hz), ( hx,  hy,  hz), (-hx,  hy,  hz),  # top
-    ]
-    mesh.GetPointsAttr().Set([Gf.Vec3f(*p) for p in points])
+    ], dtype=np.float32)
+    mesh.GetPointsAttr().Set(Vt.Vec3fArray.FromNumpy(points))
 
     # 6 faces, 4 vertices each
-    mesh.GetFaceVertexCountsAttr().Set([4, 4, 4, 4, 4, 4])
-    mesh.GetFaceVertexIndicesAttr().Set([
+    mesh.GetFaceVertexCountsAttr().Set(Vt.IntArray.FromNumpy(np.full(6, 4, dtype=np.int32)))
+    mesh.GetFaceVertexIndicesAttr().Set(Vt.IntArray.FromNumpy(np.array([
         0, 3, 2, 1,  # bottom
         4, 5, 6, 7,  # top
         0, 1, 5, 4,  # front
         2, 3, 7, 6,  # back
         0, 4, 7, 3,  # left
         1, 2, 6, 5,  # right
-    ])
+    ], dtype=np.int32)))
 
-    mesh.GetExtentAttr().Set([Gf.Vec3f(-hx, -hy, -hz), Gf.Vec3f(hx, hy, hz)])
+    mesh.GetExtentAttr().Set(Vt.Vec3fArray.FromNumpy(points[[0, 6]]))
     return mesh
 
 
 def _add_mesh_cylinder(stage, path, radius, height, segments=16):
     """Create a cylinder as a Mesh prim."""
-    import math
     mesh = UsdGeom.Mesh.Define(stage, path)
 
-    points = []
-    face_vertex_counts = []
-    face_vertex_indices = []
-
-    # Bottom center = 0, top center = 1
-    points.append(Gf.Vec3f(0, 0, 0))
-    points.append(Gf.Vec3f(0, 0, height))
-
-    # Ring vertices: bottom ring starts at index 2, top ring at 2 + segments
-    for i in range(segments):
-        angle = 2 * math.pi * i / segments
-        x = radius * math.cos(angle)
-        y = radius * math.sin(angle)
-        points.append(Gf.Vec3f(x, y, 0))       # bottom ring
-        points.append(Gf.Vec3f(x, y, height))   # top ring
-
-    # Side faces (quads)
-    for i in range(segments):
-        bl = 2 + i * 2          # bottom-left
-        br = 2 + ((i + 1) % segments) * 2  # bottom-right
-        tl = bl + 1             # top-left
-        tr = br + 1             # top-right
-        face_vertex_counts.append(4)
-        face_vertex_indices.extend([bl, br, tr, tl])
-
-    # Bottom cap (triangle fan)
-    for i in range(segments):
-        curr = 2 + i * 2
-        nxt = 2 + ((i + 1) % segments) * 2
-        face_vertex_counts.append(3)
-        face_vertex_indices.extend([0, nxt, curr])
-
-    # Top cap (triangle fan)
-    for i in range(segments):
-        curr = 2 + i * 2 + 1
-        nxt = 2 + ((i + 1) % segments) * 2 + 1
-        face_vertex_counts.append(3)
-        face_vertex_indices.extend([1, curr, nxt])
-
-    mesh.GetPointsAttr().Set(points)
-    mesh.GetFaceVertexCountsAttr().Set(face_vertex_counts)
-    mesh.GetFaceVertexIndicesAttr().Set(face_vertex_indices)
+    # Bottom center = 0, top center = 1, then interleaved bottom/top ring
+    # vertices: bottom ring at 2, 4, ..., top ring at 3, 5, ...
+    angle = 2 * np.pi * np.arange(segments) / segments
+    points = np.zeros((2 + 2 * segments, 3), dtype=np.float32)
+    points[1, 2] = height
+    points[2::2, 0] = points[3::2, 0] = radius * np.cos(angle)
+    points[2::2, 1] = points[3::2, 1] = radius * np.sin(angle)
+    points[3::2, 2] = height
+
+    i = np.arange(segments)
+    curr = 2 + i * 2
+    nxt = 2 + ((i + 1) % segments) * 2
+    zeros = np.zeros(segments, dtype=np.int32)
+
+    # Side faces (quads), then bottom and top caps (triangle fans)
+    sides = np.stack([curr, nxt, nxt + 1, curr + 1], axis=1)
+    bottom = np.stack([zeros, nxt, curr], axis=1)
+    top = np.stack([zeros + 1, curr + 1, nxt + 1], axis=1)
+
+    face_vertex_counts = np.repeat(np.array([4, 3, 3], dtype=np.int32), segments)
+    face_vertex_indices = np.concatenate(
+        [sides.ravel(), bottom.ravel(), top.ravel()]
+    ).astype(np.int32)
+
+    mesh.GetPointsAttr().Set(Vt.Vec3fArray.FromNumpy(points))
+    mesh.GetFaceVertexCountsAttr().Set(Vt.IntArray.FromNumpy(face_vertex_counts))
+    mesh.GetFaceVertexIndicesAttr().Set(Vt.IntArray.FromNumpy(face_vertex_indices))
     mesh.GetExtentAttr().Set([Gf.Vec3f(-radius, -radius, 0), Gf.Vec3f(radius, radius, height)])
     return mesh
 
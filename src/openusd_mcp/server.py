@@ -6,15 +6,31 @@ Uses the official MCP Python SDK (FastMCP).
 Usage:
     openusd-mcp              # stdio transport (for Claude Desktop, Cursor, etc.)
     openusd-mcp --http       # HTTP transport (for MCP Inspector, web clients)
+
+Set USD_MCP_PRELOAD to a USD file path to open it into the stage cache at
+startup.
 """
 
 import json
-from typing import Optional
+from typing import Any, Optional
 
 from mcp.server.fastmcp import FastMCP
 
 from openusd_mcp import tools
 
+try:
+    import orjson
+except ImportError:  # optional: pip install openusd-mcp[fast]
+    orjson = None
+
+
+def _dumps(result: Any) -> str:
+    """Serialize a tool result as indented JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(result, indent=2)
+
+
 # -- Server -----------------------------------------------------------------
 
 mcp = FastMCP(
@@ -26,26 +42,33 @@ mcp = FastMCP(
 # -- Tools ------------------------------------------------------------------
 
 @mcp.tool()
-def usd_inspect(path: str) -> str:
+def usd_inspect(path: str, include_materials: bool = True) -> str:
     """Read the scene graph of a USD file.
 
     Returns the full prim hierarchy with types, face counts, and child structure.
     Supports .usda, .usdc, and .usdz files.
+
+    Args:
+        path: Path to the USD file
+        include_materials: Include Material prims and their shaders. Set to
+            false to list only the geometry hierarchy.
     """
-    result = tools.inspect_scene(path)
-    return json.dumps(result, indent=2)
+    result = tools.inspect_scene(path, include_materials)
+    return _dumps(result)
 
 
 @mcp.tool()
-def usd_get_prim(path: str, prim_path: str) -> str:
+def usd_get_prim(path: str, prim_path: str, include_arrays: bool = False) -> str:
     """Get detailed attributes, metadata, and material binding for a specific prim.
 
     Args:
         path: Path to the USD file
         prim_path: Scene graph path, e.g. /World/Body
+        include_arrays: Return full values of large array attributes (e.g. mesh
+            points) instead of a type and length summary
     """
-    result = tools.get_prim(path, prim_path)
-    return json.dumps(result, indent=2)
+    result = tools.get_prim(path, prim_path, include_arrays)
+    return _dumps(result)
 
 
 @mcp.tool()
@@ -56,7 +79,7 @@ def usd_get_materials(path: str) -> str:
     for each material.
     """
     result = tools.get_materials(path)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
@@ -68,7 +91,7 @@ def usd_get_transforms(path: str, prim_path: Optional[str] = None) -> str:
         prim_path: Optional specific prim path. Omit to get all xformable prims.
     """
     result = tools.get_transforms(path, prim_path)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
@@ -79,7 +102,7 @@ def usd_list_variants(path: str) -> str:
     (e.g. material options, LOD levels, regional variants).
     """
     result = tools.list_variants(path)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
@@ -93,7 +116,7 @@ def usd_set_variant(path: str, prim_path: str, variant_set: str, variant: str) -
         variant: Variant to select
     """
     result = tools.set_variant(path, prim_path, variant_set, variant)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
@@ -107,7 +130,7 @@ def usd_export_mesh(path: str, prim_path: str, output: str, format: str = "stl")
         format: Output format - 'stl' (default) or 'obj'
     """
     result = tools.export_mesh(path, prim_path, output, format)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
@@ -117,15 +140,31 @@ def usd_scene_stats(path: str) -> str:
     Returns dimensions in millimeters (assuming the stage uses standard USD units).
     """
     result = tools.scene_stats(path)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 # -- Entry point ------------------------------------------------------------
 
+def _preload_stage() -> None:
+    """Open the stage named by USD_MCP_PRELOAD so the first tool call is warm."""
+    import os
+    import sys
+
+    path = os.environ.get("USD_MCP_PRELOAD")
+    if not path:
+        return
+    try:
+        tools._open_stage(path)
+    except Exception as e:
+        # stdout carries the stdio transport, so report on stderr
+        print(f"openusd-mcp: failed to preload {path}: {e}", file=sys.stderr)
+
+
 def main():
     """Run the MCP server."""
     import sys
 
+    _preload_stage()
     if "--http" in sys.argv:
         mcp.run(transport="streamable-http")
     else:
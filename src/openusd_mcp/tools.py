@@ -3,60 +3,208 @@
 Each function corresponds to an MCP tool. They take file paths and prim paths
 as input and return dicts suitable for JSON serialization.
 
-Requires: pip install usd-core
+Requires: pip install usd-core numpy
 """
 
 from __future__ import annotations
 
+import copy
 import os
 import struct
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
+# Buffer size for mesh export, so small files go out in a single write
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Binary STL triangle record: normal, three vertices, attribute byte count
+_STL_DTYPE = [
+    ("n", "<f4", 3),
+    ("v0", "<f4", 3),
+    ("v1", "<f4", 3),
+    ("v2", "<f4", 3),
+    ("attr", "<u2"),
+]
+# Triangles per STL write; 64k records (~3 MB) per chunk
+_STL_CHUNK = 1 << 16
+
+
+# Opened stages, most recently used last: abspath -> (layer mtimes, stage)
+_STAGE_CACHE: OrderedDict[str, tuple[dict[str, Optional[int]], Any]] = OrderedDict()
+_STAGE_CACHE_MAX = 8
+_STAGE_CACHE_LOCK = threading.Lock()
+
+
+def _file_mtime(path: str) -> Optional[int]:
+    """mtime of a file in ns, or None if it can't be stat'ed."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _layer_mtimes(stage) -> dict[str, Optional[int]]:
+    """mtimes of the files behind every layer the stage composes."""
+    from pxr import Ar
+
+    mtimes: dict[str, Optional[int]] = {}
+    for layer in stage.GetUsedLayers():
+        real_path = layer.realPath
+        if not real_path:
+            continue  # anonymous (e.g. session) layers
+        if Ar.IsPackageRelativePath(real_path):
+            # Layers inside a .usdz change with the package file
+            real_path = Ar.SplitPackageRelativePathOuter(real_path)[0]
+        mtimes[real_path] = _file_mtime(real_path)
+    return mtimes
+
 
 def _open_stage(path: str):
-    """Open a USD stage from a file path."""
+    """Open a USD stage from a file path.
+
+    Stages are cached per file and reloaded when the file or any sublayer
+    or referenced file it composes changes on disk.
+    """
     from pxr import Usd
 
     if not os.path.exists(path):
         raise FileNotFoundError(f"File not found: {path}")
 
-    stage = Usd.Stage.Open(path)
-    if stage is None:
-        raise ValueError(f"Failed to open USD stage: {path}")
+    key = os.path.abspath(path)
+
+    with _STAGE_CACHE_LOCK:
+        cached = _STAGE_CACHE.get(key)
+        if cached is not None:
+            mtimes, stage = cached
+            if any(_file_mtime(p) != m for p, m in mtimes.items()):
+                # Re-opening would get the old layers back from the layer
+                # registry while this stage keeps them alive; reload from disk
+                stage.Reload()
+                _STATS_CACHE.pop(stage, None)
+                _MATERIAL_CACHE.pop(stage, None)
+                _STAGE_CACHE[key] = (_layer_mtimes(stage), stage)
+            _STAGE_CACHE.move_to_end(key)
+            return stage
+
+        stage = Usd.Stage.Open(path)
+        if stage is None:
+            raise ValueError(f"Failed to open USD stage: {path}")
+        # Layers shared with another live stage come back from the registry
+        # as loaded then; Reload re-reads only those whose files changed
+        stage.Reload()
+
+        _STAGE_CACHE[key] = (_layer_mtimes(stage), stage)
+        _STAGE_CACHE.move_to_end(key)
+        while len(_STAGE_CACHE) > _STAGE_CACHE_MAX:
+            _STAGE_CACHE.popitem(last=False)
     return stage
 
 
-def inspect_scene(path: str) -> dict[str, Any]:
-    """Read the scene graph — list all prims with types and hierarchy."""
+def _invalidate_stage(path: str) -> None:
+    """Drop a cached stage so the next call re-reads it from disk."""
+    with _STAGE_CACHE_LOCK:
+        _STAGE_CACHE.pop(os.path.abspath(path), None)
+
+
+def _stage_is_dirty(stage) -> bool:
+    """Whether any layer of the stage has unsaved in-memory edits."""
+    return any(layer.dirty for layer in stage.GetUsedLayers())
+
+
+def inspect_scene(path: str, include_materials: bool = True) -> dict[str, Any]:
+    """Read the scene graph — list all prims with types and hierarchy.
+
+    With include_materials=False, Material prims and their shader networks
+    are left out and their subtrees are not traversed.
+    """
     from pxr import Usd, UsdGeom
 
     stage = _open_stage(path)
 
-    def _walk(prim) -> dict:
-        children = [_walk(child) for child in prim.GetChildren()]
+    # Single pre-order pass; each node is attached to its parent by path
+    scene: list[dict[str, Any]] = []
+    nodes: dict[Any, dict[str, Any]] = {}
+    it = iter(Usd.PrimRange.Stage(stage))
+    for prim in it:
+        type_name = prim.GetTypeName()
+        if type_name == "Material" and not include_materials:
+            it.PruneChildren()
+            continue
+
+        prim_path = prim.GetPath()
         info: dict[str, Any] = {
-            "path": str(prim.GetPath()),
-            "type": prim.GetTypeName(),
+            "path": str(prim_path),
+            "type": type_name,
         }
-        if prim.GetTypeName() == "Mesh":
-            mesh = UsdGeom.Mesh(prim)
-            face_counts = mesh.GetFaceVertexCountsAttr().Get()
-            if face_counts:
-                info["faces"] = len(face_counts)
-        if children:
-            info["children"] = children
-        return info
-
-    root = stage.GetPseudoRoot()
+        if type_name == "Mesh":
+            # GetFaceCount reads the count in C++ without a Python array copy
+            faces = UsdGeom.Mesh(prim).GetFaceCount()
+            if faces:
+                info["faces"] = faces
+        nodes[prim_path] = info
+
+        parent = nodes.get(prim_path.GetParentPath())
+        if parent is None:
+            scene.append(info)
+        else:
+            parent.setdefault("children", []).append(info)
+
     return {
-        "scene": [_walk(child) for child in root.GetChildren()],
+        "scene": scene,
         "up_axis": str(UsdGeom.GetStageUpAxis(stage)),
         "meters_per_unit": UsdGeom.GetStageMetersPerUnit(stage),
     }
 
 
-def get_prim(path: str, prim_path: str) -> dict[str, Any]:
-    """Get detailed attributes and metadata for a specific prim."""
+# Arrays longer than this are summarized in get_prim unless explicitly requested
+_MAX_INLINE_ARRAY = 32
+
+
+def _jsonify(val, include_arrays: bool = False):
+    """Convert a USD attribute value to a JSON-serializable value.
+
+    Vt arrays and Sdf.AssetPathArray values longer than _MAX_INLINE_ARRAY
+    are summarized as {"__array__": type, "len": n} unless include_arrays
+    is set.
+    """
+    if val is None or isinstance(val, (bool, int, float, str)):
+        return val
+
+    module = type(val).__module__
+    # Sdf.AssetPathArray lives in pxr.Sdf but is an array like the Vt types
+    if module == "pxr.Vt" or type(val).__name__ == "AssetPathArray":
+        if not include_arrays and len(val) > _MAX_INLINE_ARRAY:
+            return {"__array__": type(val).__name__, "len": len(val)}
+        # Numeric arrays expose their C++ buffer; convert it in one call rather
+        # than wrapping every element. Quat buffers store the real part last,
+        # so those go through str() below like scalar quats.
+        if not type(val).__name__.startswith("Quat"):
+            try:
+                import numpy as np
+
+                return np.asarray(memoryview(val)).tolist()
+            except TypeError:
+                pass  # token/string/asset arrays have no buffer
+        # Asset path elements become their path string below
+        return [_jsonify(v, include_arrays) for v in val]
+    if module == "pxr.Gf" and hasattr(val, "__len__"):
+        # Vectors and matrices (as nested row lists)
+        return [_jsonify(v) for v in val]
+    if module == "pxr.Sdf" and hasattr(val, "path"):
+        return val.path  # Sdf.AssetPath
+    return str(val)
+
+
+def get_prim(path: str, prim_path: str, include_arrays: bool = False) -> dict[str, Any]:
+    """Get detailed attributes and metadata for a specific prim.
+
+    Only authored attributes are returned; schema fallback values are
+    omitted. Large array attributes (e.g. mesh points) are summarized by
+    type and length; pass include_arrays=True to return their full values.
+    """
     from pxr import Usd, UsdGeom, UsdShade
 
     stage = _open_stage(path)
@@ -65,10 +213,12 @@ def get_prim(path: str, prim_path: str) -> dict[str, Any]:
         return {"error": f"Prim not found: {prim_path}"}
 
     attrs = {}
-    for attr in prim.GetAttributes():
+    # Skip fallback-only schema attributes: they carry no scene data but
+    # each would still need value resolution
+    for attr in prim.GetAuthoredAttributes():
         val = attr.Get()
         if val is not None:
-            attrs[attr.GetName()] = str(val)
+            attrs[attr.GetName()] = _jsonify(val, include_arrays)
 
     result: dict[str, Any] = {
         "path": prim_path,
@@ -86,33 +236,51 @@ def get_prim(path: str, prim_path: str) -> dict[str, Any]:
     return result
 
 
+def _material_info(prim) -> dict[str, Any]:
+    """Describe a material prim and the parameters of its surface shader."""
+    from pxr import UsdShade
+
+    mat = UsdShade.Material(prim)
+    surface = mat.GetSurfaceOutput()
+    shader_info: dict[str, Any] = {"path": str(prim.GetPath())}
+
+    # Get connected shader
+    sources, _invalid = surface.GetConnectedSources()
+    for source_info in sources:
+        shader_prim = source_info.source.GetPrim()
+        shader = UsdShade.Shader(shader_prim)
+        params = {}
+        for inp in shader.GetInputs():
+            val = inp.Get()
+            if val is not None:
+                params[inp.GetBaseName()] = str(val)
+        shader_info["shader"] = str(shader_prim.GetPath())
+        shader_info["params"] = params
+
+    return shader_info
+
+
+# Material info per cached stage, keyed by material path; entries are dropped
+# when _open_stage reloads the stage after any of its layers changed
+_MATERIAL_CACHE: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
 def get_materials(path: str) -> dict[str, Any]:
     """List all materials with their shader parameters."""
-    from pxr import Usd, UsdShade
+    from pxr import UsdShade
 
     stage = _open_stage(path)
+    # Shader inputs of a stage with unsaved edits can't be reused
+    cache = {} if _stage_is_dirty(stage) else _MATERIAL_CACHE.setdefault(stage, {})
     materials = []
 
     for prim in stage.Traverse():
         if prim.IsA(UsdShade.Material):
-            mat = UsdShade.Material(prim)
-            surface = mat.GetSurfaceOutput()
-            shader_info: dict[str, Any] = {"path": str(prim.GetPath())}
-
-            # Get connected shader
-            sources, _invalid = surface.GetConnectedSources()
-            for source_info in sources:
-                shader_prim = source_info.source.GetPrim()
-                shader = UsdShade.Shader(shader_prim)
-                params = {}
-                for inp in shader.GetInputs():
-                    val = inp.Get()
-                    if val is not None:
-                        params[inp.GetBaseName()] = str(val)
-                shader_info["shader"] = str(shader_prim.GetPath())
-                shader_info["params"] = params
-
-            materials.append(shader_info)
+            mat_path = prim.GetPath()
+            info = cache.get(mat_path)
+            if info is None:
+                info = cache[mat_path] = _material_info(prim)
+            materials.append(copy.deepcopy(info))
 
     return {"materials": materials}
 
@@ -122,20 +290,21 @@ def get_transforms(path: str, prim_path: Optional[str] = None) -> dict[str, Any]
     from pxr import Usd, UsdGeom
 
     stage = _open_stage(path)
-    time = Usd.TimeCode.Default()
+    # XformCache memoizes parent-to-world matrices, so each prim composes
+    # only its own ops instead of re-walking its whole ancestor chain
+    xform_cache = UsdGeom.XformCache(Usd.TimeCode.Default())
     results = []
 
     if prim_path:
         prims = [stage.GetPrimAtPath(prim_path)]
     else:
-        prims = [p for p in stage.Traverse() if p.IsA(UsdGeom.Xformable)]
+        prims = (p for p in Usd.PrimRange.Stage(stage) if p.IsA(UsdGeom.Xformable))
 
     for prim in prims:
         if not prim.IsValid():
             continue
-        xform = UsdGeom.Xformable(prim)
-        local = xform.GetLocalTransformation(time)
-        world = xform.ComputeLocalToWorldTransform(time)
+        local, _resets = xform_cache.GetLocalTransformation(prim)
+        world = xform_cache.GetLocalToWorldTransform(prim)
         results.append({
             "path": str(prim.GetPath()),
             "local_transform": str(local),
@@ -151,16 +320,20 @@ def list_variants(path: str) -> dict[str, Any]:
     results = []
 
     for prim in stage.Traverse():
+        # Cheap metadata check; most prims have no variant sets
+        if not prim.HasVariantSets():
+            continue
         vsets = prim.GetVariantSets()
         names = vsets.GetNames()
         if names:
+            # All composed selections in one call; sets without one are absent
+            selections = vsets.GetAllVariantSelections()
             prim_variants = []
             for name in names:
-                vset = vsets.GetVariantSet(name)
                 prim_variants.append({
                     "name": name,
-                    "options": vset.GetVariantNames(),
-                    "selected": vset.GetVariantSelection(),
+                    "options": vsets.GetVariantSet(name).GetVariantNames(),
+                    "selected": selections.get(name, ""),
                 })
             results.append({
                 "path": str(prim.GetPath()),
@@ -172,6 +345,8 @@ def list_variants(path: str) -> dict[str, Any]:
 
 def set_variant(path: str, prim_path: str, variant_set: str, variant: str) -> dict[str, Any]:
     """Switch a variant selection on a prim."""
+    from pxr import Usd
+
     stage = _open_stage(path)
     prim = stage.GetPrimAtPath(prim_path)
     if not prim.IsValid():
@@ -185,7 +360,11 @@ def set_variant(path: str, prim_path: str, variant_set: str, variant: str) -> di
     if variant not in vset.GetVariantNames():
         return {"error": f"Variant not found: {variant}. Available: {vset.GetVariantNames()}"}
 
-    vset.SetVariantSelection(variant)
+    # Author into this stage's own session layer so the file layer, which other
+    # cached stages may share, never picks up the unsaved edit
+    with Usd.EditContext(stage, stage.GetSessionLayer()):
+        vset.SetVariantSelection(variant)
+    _invalidate_stage(path)
     return {
         "path": prim_path,
         "variant_set": variant_set,
@@ -194,9 +373,51 @@ def set_variant(path: str, prim_path: str, variant_set: str, variant: str) -> di
     }
 
 
+def _fan_triangulate(face_vertex_counts, face_vertex_indices):
+    """Fan-triangulate convex faces into an (T, 3) array of point indices."""
+    import numpy as np
+
+    fvc = np.asarray(face_vertex_counts, dtype=np.int32)
+    fvi = np.asarray(face_vertex_indices, dtype=np.int32)
+
+    # Faces with fewer than 3 vertices contribute no triangles
+    tris_per_face = np.maximum(fvc - 2, 0)
+    face_starts = np.cumsum(fvc) - fvc
+    tri_starts = np.cumsum(tris_per_face) - tris_per_face
+
+    base = np.repeat(face_starts, tris_per_face)
+    k = np.arange(int(tris_per_face.sum())) - np.repeat(tri_starts, tris_per_face)
+    return np.stack([fvi[base], fvi[base + k + 1], fvi[base + k + 2]], axis=1)
+
+
+def _write_stl(f, pts, tri) -> None:
+    """Write a binary STL for (T, 3) triangle indices into pts.
+
+    Records are built in chunks of _STL_CHUNK triangles in one reused
+    buffer, so temporaries stay small and cache-friendly on huge meshes.
+    """
+    import numpy as np
+
+    f.write(b"\x00" * 80)  # header
+    f.write(struct.pack("<I", len(tri)))
+
+    buf = np.zeros(min(len(tri), _STL_CHUNK), dtype=_STL_DTYPE)
+    for start in range(0, len(tri), _STL_CHUNK):
+        chunk = tri[start:start + _STL_CHUNK]
+        out = buf[:len(chunk)]
+        out["v0"] = pts[chunk[:, 0]]
+        out["v1"] = pts[chunk[:, 1]]
+        out["v2"] = pts[chunk[:, 2]]
+        normal = np.cross(out["v1"] - out["v0"], out["v2"] - out["v0"])
+        length = np.linalg.norm(normal, axis=1, keepdims=True)
+        out["n"] = np.divide(normal, length, out=np.zeros_like(normal), where=length > 0)
+        f.write(out.data)
+
+
 def export_mesh(path: str, prim_path: str, output: str, fmt: str = "stl") -> dict[str, Any]:
     """Export a mesh prim as binary STL or OBJ."""
-    from pxr import UsdGeom, Gf
+    import numpy as np
+    from pxr import UsdGeom
 
     stage = _open_stage(path)
     prim = stage.GetPrimAtPath(prim_path)
@@ -211,79 +432,88 @@ def export_mesh(path: str, prim_path: str, output: str, fmt: str = "stl") -> dic
     if not points or not face_vertex_counts or not face_vertex_indices:
         return {"error": "Mesh has no geometry data"}
 
-    # Triangulate (simple fan triangulation for convex faces)
-    triangles = []
-    idx = 0
-    for count in face_vertex_counts:
-        for i in range(1, count - 1):
-            v0 = face_vertex_indices[idx]
-            v1 = face_vertex_indices[idx + i]
-            v2 = face_vertex_indices[idx + i + 1]
-            triangles.append((v0, v1, v2))
-        idx += count
+    # Vt arrays expose their C++ buffers, so these views are zero-copy
+    pts = np.asarray(points, dtype=np.float32)
+    tri = _fan_triangulate(face_vertex_counts, face_vertex_indices)
 
     if fmt == "obj":
-        lines = [f"# Exported from {prim_path}"]
-        for p in points:
-            lines.append(f"v {p[0]} {p[1]} {p[2]}")
-        for tri in triangles:
-            lines.append(f"f {tri[0]+1} {tri[1]+1} {tri[2]+1}")
-        with open(output, "w") as f:
-            f.write("\n".join(lines))
+        # savetxt formats rows in C and streams them straight to the file;
+        # %.9g round-trips float32 exactly
+        with open(output, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(f"# Exported from {prim_path}\n".encode())
+            np.savetxt(f, pts, fmt="v %.9g %.9g %.9g")
+            np.savetxt(f, tri + 1, fmt="f %d %d %d")
     else:
-        # Binary STL
-        with open(output, "wb") as f:
-            f.write(b"\x00" * 80)  # header
-            f.write(struct.pack("<I", len(triangles)))
-            for tri in triangles:
-                p0 = Gf.Vec3f(*points[tri[0]])
-                p1 = Gf.Vec3f(*points[tri[1]])
-                p2 = Gf.Vec3f(*points[tri[2]])
-                normal = (p1 - p0) ^ (p2 - p0)
-                if normal.GetLength() > 0:
-                    normal = normal.GetNormalized()
-                f.write(struct.pack("<3f", *normal))
-                f.write(struct.pack("<3f", *p0))
-                f.write(struct.pack("<3f", *p1))
-                f.write(struct.pack("<3f", *p2))
-                f.write(struct.pack("<H", 0))
+        with open(output, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            _write_stl(f, pts, tri)
 
     file_size = os.path.getsize(output)
     return {
         "output": output,
         "format": fmt,
-        "triangles": len(triangles),
+        "triangles": len(tri),
         "size_bytes": file_size,
         "status": "ok",
     }
 
 
-def scene_stats(path: str) -> dict[str, Any]:
-    """Get scene statistics."""
-    from pxr import UsdGeom
+# Below this many root prims, scene_stats traverses serially
+_PARALLEL_MIN_ROOTS = 4
 
-    stage = _open_stage(path)
+
+def _shard_stats(roots) -> tuple[int, int, int, int, Any]:
+    """Count prims, meshes, materials and faces under roots and bound them.
+
+    Returns (prim_count, mesh_count, material_count, total_faces, bbox).
+    """
+    from pxr import Gf, Usd, UsdGeom
 
     prim_count = 0
     mesh_count = 0
     material_count = 0
     total_faces = 0
 
-    for prim in stage.Traverse():
-        prim_count += 1
-        if prim.GetTypeName() == "Mesh":
-            mesh_count += 1
-            mesh = UsdGeom.Mesh(prim)
-            fc = mesh.GetFaceVertexCountsAttr().Get()
-            if fc:
-                total_faces += len(fc)
-        elif prim.GetTypeName() == "Material":
-            material_count += 1
-
-    # Bounding box
-    bbox_cache = UsdGeom.BBoxCache(0, [UsdGeom.Tokens.default_])
-    root_prim = stage.GetPseudoRoot()
-    bounds = bbox_cache.ComputeWorldBound(root_prim)
+    # Authored extentsHint lets the BBoxCache skip whole subtrees
+    bbox_cache = UsdGeom.BBoxCache(0, [UsdGeom.Tokens.default_], useExtentsHint=True)
+    bbox = Gf.BBox3d()
+
+    for root in roots:
+        for prim in Usd.PrimRange(root):
+            prim_count += 1
+            if prim.GetTypeName() == "Mesh":
+                mesh_count += 1
+                total_faces += UsdGeom.Mesh(prim).GetFaceCount()
+            elif prim.GetTypeName() == "Material":
+                material_count += 1
+        bbox = Gf.BBox3d.Combine(bbox, bbox_cache.ComputeWorldBound(root))
+
+    return prim_count, mesh_count, material_count, total_faces, bbox
+
+
+def _compute_scene_stats(stage) -> dict[str, Any]:
+    """Traverse a stage once and compute the values reported by scene_stats.
+
+    Large scenes are split by root prim into one shard per CPU; the USD
+    traversal and bounds work of each shard runs in its own thread.
+    """
+    from pxr import Gf, UsdGeom
+
+    roots = stage.GetPseudoRoot().GetChildren()
+    workers = min(os.cpu_count() or 1, len(roots))
+    if len(roots) < _PARALLEL_MIN_ROOTS or workers < 2:
+        shards = [_shard_stats(roots)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_shard_stats, [roots[i::workers] for i in range(workers)]))
+
+    prim_count = sum(shard[0] for shard in shards)
+    mesh_count = sum(shard[1] for shard in shards)
+    material_count = sum(shard[2] for shard in shards)
+    total_faces = sum(shard[3] for shard in shards)
+    bounds = Gf.BBox3d()
+    for shard in shards:
+        bounds = Gf.BBox3d.Combine(bounds, shard[4])
+
     bbox_range = bounds.ComputeAlignedRange()
     bbox_min = bbox_range.GetMin()
     bbox_max = bbox_range.GetMax()
@@ -305,3 +535,23 @@ def scene_stats(path: str) -> dict[str, Any]:
             "z": round(size[2] * scale, 1),
         },
     }
+
+
+# Scene stats per cached stage; entries are dropped when _open_stage reloads
+# the stage after any of its layers changed, and go away when it is evicted
+_STATS_CACHE: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def scene_stats(path: str) -> dict[str, Any]:
+    """Get scene statistics."""
+    stage = _open_stage(path)
+
+    # Stats of a stage with unsaved edits can't be reused
+    if _stage_is_dirty(stage):
+        return _compute_scene_stats(stage)
+
+    stats = _STATS_CACHE.get(stage)
+    if stats is None:
+        stats = _compute_scene_stats(stage)
+        _STATS_CACHE[stage] = stats
+    return copy.deepcopy(stats)
@@ -0,0 +1,253 @@
+"""Tests for the stage cache behaviour of openusd_mcp.tools."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pxr")
+
+from openusd_mcp import tools
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
+
+
+@pytest.fixture(autouse=True)
+def _clear_stage_cache():
+    tools._STAGE_CACHE.clear()
+    yield
+    tools._STAGE_CACHE.clear()
+
+
+def _copy_example(tmp_path, name):
+    dest = tmp_path / name
+    shutil.copy(EXAMPLES_DIR / name, dest)
+    return str(dest)
+
+
+def _touch_later(path):
+    """Bump a file's mtime so the change is seen even on coarse filesystems."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+
+
+def test_file_edited_between_calls_is_reloaded(tmp_path):
+    path = _copy_example(tmp_path, "desk_setup.usda")
+    assert tools.scene_stats(path)["prim_count"] == 25
+    assert [p["path"] for p in tools.inspect_scene(path)["scene"]] == ["/Desk"]
+
+    with open(path, "a") as f:
+        f.write('\ndef Xform "Extra"\n{\n}\n')
+    _touch_later(path)
+
+    assert tools.scene_stats(path)["prim_count"] == 26
+    assert {p["path"] for p in tools.inspect_scene(path)["scene"]} == {"/Desk", "/Extra"}
+
+
+def _make_referencing_scene(tmp_path, prim_path="/Product"):
+    """Write scene.usda referencing a copy of product_configurator.usda."""
+    from pxr import Usd
+
+    prod = _copy_example(tmp_path, "product_configurator.usda")
+    scene = str(tmp_path / "scene.usda")
+    stage = Usd.Stage.CreateNew(scene)
+    stage.DefinePrim(prim_path).GetReferences().AddReference("./product_configurator.usda", "/Product")
+    stage.Save()
+    return prod, scene
+
+
+def _add_product_part(prod):
+    """Add a child prim under /Product by editing the file on disk."""
+    text = Path(prod).read_text()
+    marker = '    def Mesh "Body"'
+    assert marker in text
+    Path(prod).write_text(text.replace(marker, '    def Xform "NewPart"\n    {\n    }\n\n' + marker, 1))
+    _touch_later(prod)
+
+
+def test_referenced_file_edited_between_calls_is_reloaded(tmp_path):
+    prod, scene = _make_referencing_scene(tmp_path, "/P")
+
+    def children():
+        (root,) = tools.inspect_scene(scene)["scene"]
+        return [c["path"] for c in root["children"]]
+
+    assert tools.scene_stats(scene)["prim_count"] == 13
+    assert "/P/NewPart" not in children()
+
+    _add_product_part(prod)
+
+    assert tools.scene_stats(scene)["prim_count"] == 14
+    assert "/P/NewPart" in children()
+
+
+_EXTRA_MESH = """
+def Mesh "Extra"
+{
+    float3[] extent = [(0, 0, 0), (1000, 1000, 0)]
+    int[] faceVertexCounts = [3]
+    int[] faceVertexIndices = [0, 1, 2]
+    point3f[] points = [(0, 0, 0), (1000, 0, 0), (0, 1000, 0)]
+}
+"""
+
+
+def test_scene_stats_memo_refreshes_after_sublayer_edit(tmp_path):
+    from pxr import Sdf
+
+    desk = _copy_example(tmp_path, "desk_setup.usda")
+    root = tmp_path / "root.usda"
+    layer = Sdf.Layer.CreateNew(str(root))
+    layer.subLayerPaths.append("./desk_setup.usda")
+    layer.Save()
+    del layer
+
+    before = tools.scene_stats(str(root))
+    assert tools.scene_stats(str(root)) == before  # served from the memo
+
+    with open(desk, "a") as f:
+        f.write(_EXTRA_MESH)
+    _touch_later(desk)
+
+    after = tools.scene_stats(str(root))
+    assert after["prim_count"] == before["prim_count"] + 1
+    assert after["mesh_count"] == before["mesh_count"] + 1
+    assert after["total_faces"] == before["total_faces"] + 1
+    assert after["bounds_mm"] != before["bounds_mm"]
+
+
+def test_material_memo_refreshes_after_referenced_file_edit(tmp_path):
+    prod, scene = _make_referencing_scene(tmp_path, "/P")
+
+    def accent_roughness():
+        (accent,) = [m for m in tools.get_materials(scene)["materials"]
+                     if m["path"] == "/P/Materials/AccentMetal"]
+        return float(accent["params"]["roughness"])
+
+    assert accent_roughness() == pytest.approx(0.15)
+    assert accent_roughness() == pytest.approx(0.15)  # served from the memo
+
+    text = Path(prod).read_text()
+    assert text.count("roughness = 0.15") == 1
+    Path(prod).write_text(text.replace("roughness = 0.15", "roughness = 0.5"))
+    _touch_later(prod)
+
+    assert accent_roughness() == pytest.approx(0.5)
+
+
+def _color_selection(result):
+    (prim,) = result["variants"]
+    return {v["name"]: v["selected"] for v in prim["variant_sets"]}["color"]
+
+
+def test_set_variant_does_not_leak_into_referencing_stage(tmp_path):
+    prod, scene = _make_referencing_scene(tmp_path)
+
+    # Keep a stage that shares prod's layer alive in the cache
+    tools.inspect_scene(scene)
+
+    result = tools.set_variant(prod, "/Product", "color", "red")
+    assert result["status"] == "ok"
+
+    assert _color_selection(tools.list_variants(prod)) == "midnight"
+    assert _color_selection(tools.list_variants(scene)) == "midnight"
+    assert not tools._stage_is_dirty(tools._open_stage(prod))
+
+
+def test_jsonify_asset_path_array():
+    from pxr import Sdf
+
+    assert tools._jsonify(Sdf.AssetPath("x.png")) == "x.png"
+    assert tools._jsonify(Sdf.AssetPathArray([Sdf.AssetPath("x.png")])) == ["x.png"]
+
+    big = Sdf.AssetPathArray([Sdf.AssetPath(f"t{i}.png") for i in range(100)])
+    assert tools._jsonify(big) == {"__array__": "AssetPathArray", "len": 100}
+    assert tools._jsonify(big, include_arrays=True)[-1] == "t99.png"
+
+
+@pytest.fixture(scope="module")
+def polygon_mesh(tmp_path_factory):
+    """A mixed-polygon mesh with more than one STL chunk of triangles.
+
+    Face counts range over 0-6, so some faces produce no triangles, and a
+    few faces repeat one vertex to give zero-area triangles.
+    """
+    import numpy as np
+    from pxr import Usd, UsdGeom, Vt
+
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 7, 52000).astype(np.int32)
+    points = rng.normal(size=(5000, 3)).astype(np.float32)
+    indices = rng.integers(0, len(points), int(counts.sum())).astype(np.int32)
+    indices[:60] = 7
+
+    path = str(tmp_path_factory.mktemp("mesh") / "mesh.usdc")
+    stage = Usd.Stage.CreateNew(path)
+    mesh = UsdGeom.Mesh.Define(stage, "/Mesh")
+    mesh.GetPointsAttr().Set(Vt.Vec3fArray.FromNumpy(points))
+    mesh.GetFaceVertexCountsAttr().Set(Vt.IntArray.FromNumpy(counts))
+    mesh.GetFaceVertexIndicesAttr().Set(Vt.IntArray.FromNumpy(indices))
+    stage.Save()
+
+    assert {0, 1, 2} <= set(counts.tolist())
+    return path, mesh.GetPointsAttr().Get(), counts.tolist(), indices.tolist()
+
+
+def _naive_triangles(counts, indices):
+    """Fan-triangulate face by face, the way export_mesh used to."""
+    triangles = []
+    idx = 0
+    for count in counts:
+        for i in range(1, count - 1):
+            triangles.append((indices[idx], indices[idx + i], indices[idx + i + 1]))
+        idx += count
+    return triangles
+
+
+def test_export_stl_matches_naive_loop(polygon_mesh, tmp_path):
+    import struct
+
+    import numpy as np
+
+    path, points, counts, indices = polygon_mesh
+    output = str(tmp_path / "mesh.stl")
+    result = tools.export_mesh(path, "/Mesh", output, "stl")
+
+    triangles = _naive_triangles(counts, indices)
+    assert result["triangles"] == len(triangles) > tools._STL_CHUNK
+
+    pts = list(points)
+    records = []
+    for a, b, c in triangles:
+        p0, p1, p2 = pts[a], pts[b], pts[c]
+        normal = (p1 - p0) ^ (p2 - p0)
+        if normal.GetLength() > 0:
+            normal = normal.GetNormalized()
+        records.append(struct.pack("<12fH", *normal, *p0, *p1, *p2, 0))
+    expected = b"\x00" * 80 + struct.pack("<I", len(records)) + b"".join(records)
+
+    got = Path(output).read_bytes()
+    assert len(got) == len(expected) == result["size_bytes"]
+    assert got[:84] == expected[:84]
+
+    got_recs = np.frombuffer(got, dtype=tools._STL_DTYPE, offset=84)
+    exp_recs = np.frombuffer(expected, dtype=tools._STL_DTYPE, offset=84)
+    for field in ("v0", "v1", "v2", "attr"):
+        assert got_recs[field].tobytes() == exp_recs[field].tobytes()
+    # Zero-area triangles may differ only in the sign of their zero normal
+    assert np.array_equal(got_recs["n"], exp_recs["n"])
+
+
+def test_export_obj_matches_naive_loop(polygon_mesh, tmp_path):
+    path, points, counts, indices = polygon_mesh
+    output = str(tmp_path / "mesh.obj")
+    result = tools.export_mesh(path, "/Mesh", output, "obj")
+
+    triangles = _naive_triangles(counts, indices)
+    assert result["triangles"] == len(triangles)
+
+    lines = ["# Exported from /Mesh"]
+    lines.extend(f"v {p[0]:.9g} {p[1]:.9g} {p[2]:.9g}" for p in points)
+    lines.extend(f"f {a + 1} {b + 1} {c + 1}" for a, b, c in triangles)
+    assert Path(output).read_text() == "\n".join(lines) + "\n"